@@ -5,16 +5,25 @@
 """
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import hmac
-import json
+import socket
 import time
 import uuid
-from typing import Any, Iterable
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterable
 
 import httpx
-from pydantic import BaseModel
+import orjson
+import websockets
+from pydantic import BaseModel, ConfigDict
+
+try:
+    import aiohttp
+except ImportError:  # 선택 의존성: http_backend="aiohttp"일 때만 필요
+    aiohttp = None
 
 from upbit_bot.config import get_settings
 
@@ -29,6 +38,8 @@ class OrderSide(str):
 
 
 class Ticker(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     market: str
     trade_price: float
     signed_change_rate: float
@@ -37,6 +48,8 @@ class Ticker(BaseModel):
 
 
 class Candle(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     market: str
     candle_date_time_utc: str
     opening_price: float
@@ -48,20 +61,42 @@ class Candle(BaseModel):
     candle_acc_trade_volume: float | None = None
 
 
+# 주문 전송 지연을 줄이기 위해 Nagle을 끄고, 시세 버스트를 흡수할 수 있도록 소켓 버퍼를 키운다.
+_SOCKET_OPTIONS = [
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024),
+    (socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024),
+]
+
+# base64url('{"typ":"JWT","alg":"HS256"}') — 요청마다 동일하므로 모듈 상수로 고정한다.
+_JWT_HEADER = "eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9"
+
+
+def _b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@lru_cache(maxsize=4)
+def _hmac_proto(secret_key: str) -> hmac.HMAC:
+    """키에서 유도되는 HMAC inner/outer 패드를 한 번만 계산해 둔 원형 객체."""
+
+    return hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
+
+
 def _sign_payload(query: dict[str, Any], secret_key: str, access_key: str) -> str:
-    payload = json.dumps(query, separators=(',', ':'), ensure_ascii=False)
-    query_hash = hashlib.sha512(payload.encode()).hexdigest()
+    # orjson은 공백 없는 UTF-8 bytes를 바로 반환하므로 별도 encode가 필요 없다.
+    # hashlib은 OpenSSL 백엔드를 사용하며, CPU가 SHA 확장 명령을 지원하면 런타임에 자동으로 활용한다.
+    query_hash = hashlib.sha512(orjson.dumps(query)).hexdigest()
     jwt_payload = {
         "access_key": access_key,
         "nonce": str(uuid.uuid4()),
         "query_hash": query_hash,
         "query_hash_alg": "SHA512",
     }
-    header = base64.urlsafe_b64encode(b'{"typ":"JWT","alg":"HS256"}').decode().rstrip('=')
-    body = base64.urlsafe_b64encode(json.dumps(jwt_payload).encode()).decode().rstrip('=')
-    signature = hmac.new(secret_key.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
-    sig = base64.urlsafe_b64encode(signature).decode().rstrip('=')
-    return f"Bearer {header}.{body}.{sig}"
+    body = _b64url(orjson.dumps(jwt_payload))
+    mac = _hmac_proto(secret_key).copy()
+    mac.update(f"{_JWT_HEADER}.{body}".encode())
+    return f"Bearer {_JWT_HEADER}.{body}.{_b64url(mac.digest())}"
 
 
 def _auth_headers(query: dict[str, Any]) -> dict[str, str]:
@@ -70,44 +105,186 @@ def _auth_headers(query: dict[str, Any]) -> dict[str, str]:
     return {"Authorization": token}
 
 
+# 업비트 REST 요청 수 제한(초당). 시세 API는 마켓 목록·캔들·현재가가 그룹별로 따로 제한되므로
+# 유니버스 갱신의 일봉 조회가 현재가 조회를 막지 않도록 버킷도 그룹마다 둔다.
+_RATE_LIMITS = {"market": 10.0, "candle": 10.0, "ticker": 10.0, "exchange": 30.0, "order": 8.0}
+
+
+class AsyncTokenBucket:
+    """asyncio용 토큰 버킷. 토큰이 남아 있으면 바로 통과하고, 비었을 때만 보충될 때까지 대기한다."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __aenter__(self) -> AsyncTokenBucket:
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+
+class HttpxBackend:
+    """httpx.AsyncClient 기반 기본 REST 백엔드."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self._client = client
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> Any:
+        res = await self._client.request(method, path, params=params, headers=headers, json=json)
+        _ensure_ok(res)
+        return orjson.loads(res.content)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class AiohttpBackend:
+    """aiohttp.ClientSession 기반 REST 백엔드.
+
+    다수의 요청을 asyncio.gather로 동시에 보내는 구간에서 httpx보다 클라이언트 측 오버헤드가 작다.
+    ClientSession은 실행 중인 이벤트 루프 안에서 만들어야 하므로 첫 요청 시점에 생성한다.
+    """
+
+    def __init__(self, base_url: str, timeout: float):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp 백엔드를 사용하려면 aiohttp 패키지가 필요합니다")
+        self._base_url = base_url
+        self._timeout = timeout
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                base_url=self._base_url,
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, enable_cleanup_closed=True),
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+                json_serialize=lambda obj: orjson.dumps(obj).decode(),
+            )
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> Any:
+        session = self._get_session()
+        async with session.request(method, path, params=params, headers=headers, json=json) as res:
+            if not 200 <= res.status < 300:
+                raise _api_error(res.status, await res.read())
+            return await res.json(loads=orjson.loads, content_type=None)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
 class UpbitClient:
     """업비트 REST 클라이언트.
 
-    httpx.AsyncClient를 내부적으로 사용하며 타임아웃 및 커넥션 풀을 재사용한다.
+    기본은 httpx.AsyncClient를 사용하며, 설정의 http_backend가 "aiohttp"이면 AiohttpBackend를 사용한다.
+    어느 백엔드든 타임아웃 및 커넥션 풀을 재사용한다. httpx 백엔드는 HTTP/2로 동시 요청을
+    소수의 TLS 연결에 다중화한다.
     """
 
     def __init__(self, client: httpx.AsyncClient | None = None):
         settings = get_settings()
-        self._client = client or httpx.AsyncClient(base_url=settings.rest_base_url, timeout=settings.request_timeout)
+        self._limiters = {group: AsyncTokenBucket(rate) for group, rate in _RATE_LIMITS.items()}
+        if client is None and settings.http_backend == "aiohttp":
+            self._backend: HttpxBackend | AiohttpBackend = AiohttpBackend(
+                settings.rest_base_url, settings.request_timeout
+            )
+        else:
+            self._backend = HttpxBackend(
+                client
+                or httpx.AsyncClient(
+                    base_url=settings.rest_base_url,
+                    timeout=settings.request_timeout,
+                    transport=httpx.AsyncHTTPTransport(
+                        http2=True,
+                        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60),
+                        socket_options=_SOCKET_OPTIONS,
+                    ),
+                )
+            )
+
+    def rate_limit(self, group: str) -> float:
+        """엔드포인트 그룹의 초당 요청 한도."""
+
+        return self._limiters[group].rate
+
+    async def _request(
+        self,
+        group: str,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+        auth: dict[str, Any] | None = None,
+    ) -> Any:
+        """엔드포인트 그룹의 토큰을 얻은 뒤 요청한다.
+
+        auth가 주어지면 대기 후에 서명해 nonce와 토큰이 항상 전송 직전에 만들어지도록 한다.
+        """
+
+        async with self._limiters[group]:
+            headers = _auth_headers(auth) if auth is not None else None
+            return await self._backend.request(method, path, params=params, headers=headers, json=json)
 
     async def list_markets(self, is_details: bool = False) -> list[dict[str, Any]]:
-        res = await self._client.get("/v1/market/all", params={"isDetails": str(is_details).lower()})
-        _ensure_ok(res)
-        return res.json()
+        return await self._request("market", "GET", "/v1/market/all", params={"isDetails": str(is_details).lower()})
 
     async def tickers(self, markets: Iterable[str]) -> list[Ticker]:
         params = {"markets": ",".join(markets)}
-        res = await self._client.get("/v1/ticker", params=params)
-        _ensure_ok(res)
-        return [Ticker(**item) for item in res.json()]
+        data = await self._request("ticker", "GET", "/v1/ticker", params=params)
+        return [Ticker.model_validate(item) for item in data]
+
+    async def minute_candles(self, market: str, unit: int = 1, count: int = 200) -> list[dict[str, Any]]:
+        """분봉을 디코딩된 dict 그대로 반환한다.
+
+        호출부가 곧바로 컬럼 배열로 변환하므로 캔들마다 Candle 모델 검증을 거치지 않는다.
+        """
 
-    async def minute_candles(self, market: str, unit: int = 1, count: int = 200) -> list[Candle]:
         endpoint = f"/v1/candles/minutes/{unit}"
-        res = await self._client.get(endpoint, params={"market": market, "count": count})
-        _ensure_ok(res)
-        return [Candle(**item) for item in res.json()]
+        return await self._request("candle", "GET", endpoint, params={"market": market, "count": count})
 
-    async def day_candles(self, market: str, count: int = 60) -> list[Candle]:
-        res = await self._client.get("/v1/candles/days", params={"market": market, "count": count})
-        _ensure_ok(res)
-        return [Candle(**item) for item in res.json()]
+    async def day_candles(self, market: str, count: int = 60) -> list[dict[str, Any]]:
+        """일봉을 디코딩된 dict 그대로 반환한다 (필드 구성은 Candle 모델과 동일)."""
+
+        return await self._request("candle", "GET", "/v1/candles/days", params={"market": market, "count": count})
 
     async def order_chance(self, market: str) -> dict[str, Any]:
         query = {"market": market}
-        headers = _auth_headers(query)
-        res = await self._client.get("/v1/orders/chance", params=query, headers=headers)
-        _ensure_ok(res)
-        return res.json()
+        return await self._request("exchange", "GET", "/v1/orders/chance", params=query, auth=query)
 
     async def place_order(
         self,
@@ -124,44 +301,58 @@ class UpbitClient:
             "price": str(price) if price is not None else None,
             "ord_type": ord_type,
         }
-        headers = _auth_headers({k: v for k, v in query.items() if v is not None})
-        res = await self._client.post("/v1/orders", json=query, headers=headers)
-        _ensure_ok(res)
-        return res.json()
+        auth = {k: v for k, v in query.items() if v is not None}
+        return await self._request("order", "POST", "/v1/orders", json=query, auth=auth)
+
+    async def cancel_order(self, order_uuid: str) -> dict[str, Any]:
+        query = {"uuid": order_uuid}
+        return await self._request("exchange", "DELETE", "/v1/order", params=query, auth=query)
 
     async def balances(self) -> list[dict[str, Any]]:
-        headers = _auth_headers({})
-        res = await self._client.get("/v1/accounts", headers=headers)
-        _ensure_ok(res)
-        return res.json()
+        return await self._request("exchange", "GET", "/v1/accounts", auth={})
 
     async def close(self) -> None:
-        await self._client.aclose()
+        await self._backend.close()
 
 
 class UpbitWebSocket:
     """실시간 시세·주문 데이터를 수신하기 위한 WebSocket 관리자."""
 
-    def __init__(self, client: httpx.AsyncClient | None = None):
-        settings = get_settings()
-        self.url = settings.websocket_url
-        self.client = client or httpx.AsyncClient()
-
-    async def subscribe(self, tickets: list[dict[str, Any]]):
-        """주어진 티켓 목록을 기준으로 구독 스트림을 연다."""
-
-        async with self.client.stream("GET", self.url, timeout=None) as response:
-            if response.status_code != 101:
-                raise UpbitApiError(f"WebSocket upgrade 실패: {response.status_code}")
-            async for chunk in response.aiter_raw():
-                yield chunk
+    def __init__(self, url: str | None = None):
+        self.url = url or get_settings().websocket_url
+
+    async def subscribe(self, tickets: list[dict[str, Any]]) -> AsyncIterator[bytes | str]:
+        """주어진 티켓 목록을 전송하고 수신한 프레임을 하나씩 반환한다.
+
+        각 항목은 재조립이 끝난 완전한 메시지이므로 그대로 orjson.loads에 넘길 수 있다.
+        업비트 메시지는 작아서 압축 이득보다 CPU 비용이 크므로 permessage-deflate는 끈다.
+        """
+
+        try:
+            ws = await websockets.connect(self.url, max_size=2**20, compression=None)
+        except websockets.exceptions.InvalidHandshake as exc:
+            raise UpbitApiError(f"WebSocket upgrade 실패: {exc}") from exc
+        sock = ws.transport.get_extra_info("socket")
+        if sock is not None:
+            for level, option, value in _SOCKET_OPTIONS:
+                sock.setsockopt(level, option, value)
+        try:
+            await ws.send(orjson.dumps(tickets).decode())
+            async for frame in ws:
+                yield frame
+        finally:
+            await ws.close()
+
+
+def _api_error(status: int, content: bytes) -> UpbitApiError:
+    try:
+        payload = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        payload = content.decode(errors="replace")
+    return UpbitApiError(f"{status}: {payload}")
 
 
 def _ensure_ok(response: httpx.Response) -> None:
     if response.is_success:
         return
-    try:
-        payload = response.json()
-    except Exception:
-        payload = response.text
-    raise UpbitApiError(f"{response.status_code}: {payload}")
+    raise _api_error(response.status_code, response.content)
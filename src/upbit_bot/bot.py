@@ -7,39 +7,105 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable
 
+import numpy as np
+import pandas as pd
+
 from upbit_bot.adapters.upbit import Ticker, UpbitClient
-from upbit_bot.data.market_data import MarketDataService, MarketUniverse, UniverseFilter
+from upbit_bot.data.market_data import LatestTick, MarketDataService, MarketUniverse, TickerStream, UniverseFilter
 from upbit_bot.execution.engine import ExecutionEngine
 from upbit_bot.risk.engine import RiskEngine
 from upbit_bot.strategy.engine import PositionSnapshot, Signal, StrategyEngine
 
 logger = logging.getLogger(__name__)
 
+# 청산 지표(MACD/RSI/ATR)는 5분봉 기준이므로 새 봉이 마감될 때만 REST로 다시 계산한다.
+_EXIT_FRAME_SEC = 5 * 60
+# 청산 주문이 실패한 마켓은 틱마다 재시도하지 않도록 지수적으로 늘어나는 대기 시간을 둔다.
+_EXIT_RETRY_BASE_SEC = 5.0
+_EXIT_RETRY_MAX_SEC = 300.0
+# 이 시간이 지나도록 체결되지 않은 청산 주문은 취소하고 다음 점검에서 현재가로 다시 낸다.
+_EXIT_ORDER_TTL_SEC = 60.0
+# 첫 유니버스 조회는 KRW 마켓마다 일봉을 한 번씩 요청하므로 candle 그룹 요청 한도에 묶인다.
+# 마켓 목록을 아직 모르면 이 개수로 어림하고, 그만큼 걸리는 시간에 여유를 더해 기다린다.
+_UNIVERSE_MARKETS_HINT = 250
+_UNIVERSE_WAIT_SLACK_SEC = 5.0
+
+
+def _candle_bucket() -> int:
+    return int(time.time() // _EXIT_FRAME_SEC)
+
 
 class PortfolioState:
-    """계좌 상태와 포지션 메타데이터를 캐싱한다."""
+    """계좌 상태와 포지션 메타데이터를 캐싱한다.
+
+    비중 계산용 진입가·수량은 positions와 같은 순서의 연속 배열(SoA)로도 유지하므로
+    포지션 변경은 반드시 set_positions/add_position/remove_position을 거쳐야 한다.
+    """
 
     def __init__(self):
         self.equity: float = 0.0
         self.cash: float = 0.0
         self.positions: dict[str, PositionSnapshot] = {}
+        self._markets: list[str] = []
+        self._index: dict[str, int] = {}
+        self._prices = np.empty(0, dtype=np.float64)
+        self._vols = np.empty(0, dtype=np.float64)
+
+    def set_positions(self, positions: dict[str, PositionSnapshot]) -> None:
+        self.positions = dict(positions)
+        self._markets = list(self.positions)
+        self._index = {market: i for i, market in enumerate(self._markets)}
+        n = len(self._markets)
+        self._prices = np.fromiter((p.entry_price for p in self.positions.values()), dtype=np.float64, count=n)
+        self._vols = np.fromiter((p.volume for p in self.positions.values()), dtype=np.float64, count=n)
+
+    def add_position(self, position: PositionSnapshot) -> None:
+        market = position.market
+        self.positions[market] = position
+        idx = self._index.get(market)
+        if idx is not None:
+            self._prices[idx] = position.entry_price
+            self._vols[idx] = position.volume
+            return
+        self._index[market] = len(self._markets)
+        self._markets.append(market)
+        self._prices = np.append(self._prices, position.entry_price)
+        self._vols = np.append(self._vols, position.volume)
+
+    def remove_position(self, market: str) -> PositionSnapshot | None:
+        position = self.positions.pop(market, None)
+        idx = self._index.pop(market, None)
+        if idx is None:
+            return position
+        del self._markets[idx]
+        self._prices = np.delete(self._prices, idx)
+        self._vols = np.delete(self._vols, idx)
+        self._index = {m: i for i, m in enumerate(self._markets)}
+        return position
+
+    def weight_array(self) -> np.ndarray:
+        """_markets 순서의 포지션 비중 배열."""
+
+        if self.equity == 0:
+            return np.zeros(len(self._markets), dtype=np.float64)
+        return self._prices * self._vols / self.equity
 
     def open_weights(self) -> dict[str, float]:
         if self.equity == 0:
             return {}
-        weights: dict[str, float] = {}
-        for market, pos in self.positions.items():
-            weights[market] = (pos.entry_price * pos.volume) / self.equity
-        return weights
+        return dict(zip(self._markets, self.weight_array().tolist()))
 
 
 class AutoTradingBot:
     """지표 기반 자동매매의 메인 오케스트레이터."""
 
-    def __init__(self, client: UpbitClient | None = None):
+    def __init__(self, client: UpbitClient | None = None, universe_refresh_sec: float = 300.0):
         self.client = client or UpbitClient()
+        self.universe_refresh_sec = universe_refresh_sec
         self.universe = MarketUniverse(self.client)
         self.universe_filter = UniverseFilter(self.client)
         self.data = MarketDataService(self.client)
@@ -47,6 +113,20 @@ class AutoTradingBot:
         self.strategy = StrategyEngine()
         self.risk_engine = RiskEngine(lambda: self.state.equity)
         self.execution = ExecutionEngine(self.client, self.risk_engine)
+        self._universe: list[str] = []
+        self._universe_ready = asyncio.Event()
+        self._universe_runner: asyncio.Task | None = None
+        self.ticks = TickerStream(on_tick=self._on_tick)
+        self._exit_eval_bucket: dict[str, int] = {}
+        self._exiting: set[str] = set()
+        # 청산 주문을 낸 마켓 -> (주문 uuid, 전송 시각). 주문이 체결·취소되어 잠긴 수량이 없어질 때까지 다시 청산하지 않는다.
+        self._exit_pending: dict[str, tuple[str, float]] = {}
+        self._exit_failures: dict[str, int] = {}
+        self._exit_retry_at: dict[str, float] = {}
+        self._exit_tasks: set[asyncio.Task] = set()
+        # 배치 스코어링 커널은 GIL을 놓고 내부에서 병렬로 돌므로 전용 스레드 하나에서만 호출한다.
+        # run_forever 종료 시 정리하고, 다음 사이클에서 필요할 때 다시 만든다.
+        self._scoring_pool: ThreadPoolExecutor | None = None
 
     async def _fetch_tickers(self, markets: Iterable[str]) -> dict[str, Ticker]:
         tickers = await self.client.tickers(markets)
@@ -55,32 +135,38 @@ class AutoTradingBot:
     async def refresh_portfolio(self) -> None:
         """업비트 계좌 정보를 바탕으로 현금/포지션/총액을 동기화한다."""
 
+        requested_at = time.monotonic()
         balances = await self.client.balances()
         krw = 0.0
-        holding_markets: dict[str, float] = {}
-        avg_price: dict[str, float] = {}
+        # market -> (보유 수량, 평균 매수가)
+        holdings: dict[str, tuple[float, float]] = {}
+        # 미체결 주문에 잠긴 수량이 있는 마켓
+        locked_markets: set[str] = set()
 
         for bal in balances:
             currency = bal.get("currency")
-            total_qty = float(bal.get("balance", 0)) + float(bal.get("locked", 0))
+            locked = float(bal.get("locked", 0))
+            total_qty = float(bal.get("balance", 0)) + locked
             if currency == "KRW":
                 krw += total_qty
             else:
                 market = f"KRW-{currency}"
-                holding_markets[market] = total_qty
-                avg_price[market] = float(bal.get("avg_buy_price", 0))
+                holdings[market] = (total_qty, float(bal.get("avg_buy_price", 0)))
+                if locked > 0:
+                    locked_markets.add(market)
 
-        tickers = await self._fetch_tickers(holding_markets.keys()) if holding_markets else {}
+        tickers = await self._fetch_tickers(holdings.keys()) if holdings else {}
         equity = krw
         positions: dict[str, PositionSnapshot] = {}
 
-        for market, qty in holding_markets.items():
-            price = tickers.get(market).trade_price if market in tickers else avg_price.get(market, 0)
+        for market, (qty, avg_price) in holdings.items():
+            ticker = tickers.get(market)
+            price = ticker.trade_price if ticker is not None else avg_price
             equity += price * qty
             positions[market] = PositionSnapshot(
                 market=market,
                 side="buy",
-                entry_price=avg_price.get(market, price),
+                entry_price=avg_price,
                 volume=qty,
                 stop=price * 0.97,
                 take_profit=price * 1.05,
@@ -89,45 +175,222 @@ class AutoTradingBot:
 
         self.state.equity = equity
         self.state.cash = krw
-        self.state.positions = positions
+        self.state.set_positions(positions)
+        # 잔고 조회 전에 낸 청산 주문 중 잠긴 수량이 없어진(체결·취소된) 마켓은 대기 목록에서 뺀다.
+        for market, (_, submitted_at) in list(self._exit_pending.items()):
+            if submitted_at < requested_at and market not in locked_markets:
+                del self._exit_pending[market]
+
+    async def _expire_exit_orders(self) -> None:
+        """_EXIT_ORDER_TTL_SEC 넘게 미체결인 청산 주문을 취소해 다음 점검에서 다시 가격을 매기게 한다."""
+
+        now = time.monotonic()
+        stale = [
+            (market, order_uuid)
+            for market, (order_uuid, submitted_at) in self._exit_pending.items()
+            if order_uuid and now - submitted_at >= _EXIT_ORDER_TTL_SEC
+        ]
+        if not stale:
+            return
+        results = await asyncio.gather(
+            *(self.execution.cancel_order(order_uuid) for _, order_uuid in stale), return_exceptions=True
+        )
+        for (market, _), result in zip(stale, results):
+            if isinstance(result, Exception):
+                # 이미 체결된 주문이면 다음 잔고 갱신에서 대기 목록이 정리된다.
+                logger.error("%s 청산 주문 취소 실패: %s", market, result)
+                continue
+            self._exit_pending.pop(market, None)
 
     async def _select_universe(self) -> list[str]:
         markets = await self.universe.fetch_krw_markets()
         return await self.universe_filter.filter_by_liquidity(markets, top_n=50)
 
-    async def _generate_signals(self, markets: list[str]) -> dict[str, Signal]:
-        candles = await self.data.fetch_multi(markets, unit=5, count=200)
-        signals: dict[str, Signal] = {}
-        for market, frame in candles.items():
-            sig = self.strategy.generate_entry_signal(market, frame)
-            if sig:
-                signals[market] = sig
-        return signals
+    async def _universe_task(self, retry_sec: float) -> None:
+        """universe_refresh_sec 주기로 유니버스를 갱신해 최신 스냅샷을 게시한다.
+
+        첫 게시에 성공하기 전에는 retry_sec 간격으로 다시 시도한다.
+        """
+
+        while True:
+            try:
+                self._universe = await self._select_universe()
+                self._universe_ready.set()
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("유니버스 갱신 오류: %s", exc)
+            await asyncio.sleep(self.universe_refresh_sec if self._universe_ready.is_set() else retry_sec)
+
+    async def _current_universe(self) -> list[str]:
+        """백그라운드 갱신 태스크가 게시한 스냅샷을 반환한다. 갱신 태스크가 없을 때만 직접 조회한다."""
+
+        if self._universe_runner is None or self._universe_runner.done():
+            return await self._select_universe()
+        # 첫 사이클에는 갱신 태스크의 첫 조회를 기다려 같은 조회를 두 번 보내지 않는다.
+        # 첫 조회가 늦어지거나 실패해도 청산 점검이 막히지 않도록 대기 시간을 제한하고 빈 유니버스로 진행한다.
+        if not self._universe_ready.is_set():
+            try:
+                await asyncio.wait_for(self._universe_ready.wait(), self._universe_wait_sec())
+            except asyncio.TimeoutError:
+                logger.warning("유니버스 첫 조회 대기 시간 초과: 이번 사이클은 청산만 점검합니다")
+        return self._universe
+
+    def _universe_wait_sec(self) -> float:
+        """일봉 조회 수를 candle 그룹 요청 한도로 나눈 첫 유니버스 조회 예상 시간에 여유를 더한 값."""
+
+        n_markets = self.universe.cached_count or _UNIVERSE_MARKETS_HINT
+        return n_markets / self.client.rate_limit("candle") + _UNIVERSE_WAIT_SLACK_SEC
+
+    async def _sync_positions(self) -> None:
+        """계좌를 갱신하고 오래된 청산 주문을 정리한 뒤 보유 포지션의 틱 스트림을 맞춘다."""
+
+        await self.refresh_portfolio()
+        await self._expire_exit_orders()
+        # 보유 포지션의 틱 기반 손절·익절은 유니버스 대기나 캔들 조회와 무관하게 먼저 켜 둔다.
+        self.ticks.ensure(self.state.positions)
 
-    async def _exit_checks(self, markets: Iterable[str]) -> None:
+    async def _generate_signals(self, markets: list[str], candles: dict[str, pd.DataFrame]) -> dict[str, Signal]:
+        # 조회 시 갱신된 float32 CandleBuffer를 우선 쓰고, 버퍼가 없으면 프레임을 그대로 넘긴다.
+        frames = {}
+        for market in markets:
+            if market not in candles:
+                continue
+            buffer = self.data.buffer(market, unit=5)
+            frames[market] = buffer if buffer is not None and len(buffer) else candles[market]
+        if self._scoring_pool is None:
+            self._scoring_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._scoring_pool, self.strategy.generate_entry_signals, frames)
+
+    def _exit_frame_markets(self) -> set[str]:
+        """청산 지표 재계산을 위해 5분봉 프레임이 필요한 보유 마켓.
+
+        스트림 틱이 없으면 매 사이클, 있으면 마지막 평가 이후 새 5분봉이 마감된 경우에만 조회한다.
+        """
+
+        bucket = _candle_bucket()
+        return {
+            market
+            for market in self.state.positions
+            if not self._exit_blocked(market)
+            and (self.ticks.get(market) is None or self._exit_eval_bucket.get(market) != bucket)
+        }
+
+    def _exit_blocked(self, market: str) -> bool:
+        """청산 진행 중이거나, 이미 낸 청산이 남아 있거나, 실패 후 대기 중인 마켓."""
+
+        return (
+            market in self._exiting
+            or market in self._exit_pending
+            or time.monotonic() < self._exit_retry_at.get(market, 0.0)
+        )
+
+    async def _close_position(self, market: str, pos: PositionSnapshot, price: float) -> None:
+        self._exiting.add(market)
+        try:
+            result = await self.execution.submit_limit_order(
+                market, "sell" if pos.side == "buy" else "buy", price, pos.volume
+            )
+        except Exception:
+            failures = self._exit_failures.get(market, 0) + 1
+            self._exit_failures[market] = failures
+            delay = min(_EXIT_RETRY_BASE_SEC * 2 ** (failures - 1), _EXIT_RETRY_MAX_SEC)
+            self._exit_retry_at[market] = time.monotonic() + delay
+            raise
+        finally:
+            self._exiting.discard(market)
+        self._exit_failures.pop(market, None)
+        self._exit_retry_at.pop(market, None)
+        self._exit_pending[market] = (result.order_uuid, time.monotonic())
+        logger.info("%s 포지션 종료: %.4f", market, price)
+        self.state.remove_position(market)
+
+    async def _exit_on_tick(self, market: str, pos: PositionSnapshot, price: float) -> None:
+        try:
+            await self._close_position(market, pos, price)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("%s 틱 기반 청산 실패: %s", market, exc)
+
+    def _on_tick(self, tick: LatestTick) -> None:
+        """스트림 틱이 손절·익절 가격에 닿으면 사이클을 기다리지 않고 즉시 청산한다."""
+
+        pos = self.state.positions.get(tick.market)
+        if pos is None or self._exit_blocked(tick.market) or not self.strategy.price_exit(tick.trade_price, pos):
+            return
+        self._exiting.add(tick.market)
+        price = self.execution.align_price(tick.trade_price)
+        task = asyncio.create_task(self._exit_on_tick(tick.market, pos, price))
+        self._exit_tasks.add(task)
+        task.add_done_callback(self._exit_tasks.discard)
+
+    async def _exit_checks(self, candles: dict[str, pd.DataFrame]) -> None:
         if not self.state.positions:
             return
 
-        candles = await self.data.fetch_multi(markets, unit=5, count=200)
-        for market, pos in list(self.state.positions.items()):
+        bucket = _candle_bucket()
+        exits: list[tuple[str, PositionSnapshot]] = []
+        last_prices: list[float] = []
+        for market, pos in self.state.positions.items():
+            if self._exit_blocked(market):
+                continue
+            tick = self.ticks.get(market)
+            if tick is not None and self.strategy.price_exit(tick.trade_price, pos):
+                exits.append((market, pos))
+                last_prices.append(tick.trade_price)
+                continue
             frame = candles.get(market)
             if frame is None or frame.empty:
                 continue
+            self._exit_eval_bucket[market] = bucket
             if self.strategy.should_exit(frame, pos):
-                price = self.execution.align_price(frame["close"].iloc[-1])
-                await self.execution.submit_limit_order(market, "sell" if pos.side == "buy" else "buy", price, pos.volume)
-                logger.info("%s 포지션 종료: %.4f", market, price)
-                self.state.positions.pop(market, None)
+                exits.append((market, pos))
+                last_prices.append(tick.trade_price if tick is not None else frame["close"].iloc[-1])
+        if not exits:
+            return
+
+        # 청산 주문은 동시에 전송해 N개 포지션 청산이 RTT 한 번 수준으로 끝나도록 한다.
+        # gather가 코루틴을 시작하기 전에 들어온 틱이 같은 마켓을 또 청산하지 않도록 미리 진행 중으로 표시한다.
+        self._exiting.update(market for market, _ in exits)
+        prices = self.execution.align_prices(np.array(last_prices, dtype=np.float64)).tolist()
+        results = await asyncio.gather(
+            *(self._close_position(market, pos, price) for (market, pos), price in zip(exits, prices)),
+            return_exceptions=True,
+        )
+        for (market, _), result in zip(exits, results):
+            if isinstance(result, Exception):
+                logger.error("%s 청산 주문 실패: %s", market, result)
 
     async def _enter_positions(self, signals: dict[str, Signal]) -> None:
         if self.risk_engine.hit_daily_limit(self.state.equity):
             logger.warning("일일 손실 한도 도달로 신규 진입 차단")
             return
 
+        # 비중과 합계를 같은 _markets 순서 배열에서 얻어 positions dict 순서에 기대지 않는다.
         open_weights = self.state.open_weights()
+        total_weight = sum(open_weights.values())
         ordered = sorted(signals.values(), key=lambda s: abs(s.score), reverse=True)
-        for signal in ordered:
-            if not self.risk_engine.can_open_new_position(signal.market, open_weights):
+        # 청산이 진행·대기 중인 마켓은 잠긴 매도 수량이 보유로 남아 있으므로 다시 진입하지 않는다.
+        candidates = [
+            s
+            for s in ordered
+            if not self._exit_blocked(s.market)
+            and self.risk_engine.can_open_new_position(s.market, open_weights, total_weight)
+        ]
+        if not candidates:
+            return
+
+        # 주문 가능 정보 조회(I/O)는 한꺼번에 보내고, 사이징은 현금·비중을 차감하며 순서대로 결정한다.
+        chances = await asyncio.gather(
+            *(self.execution.chance_info(s.market) for s in candidates), return_exceptions=True
+        )
+        planned: list[tuple[Signal, float, float]] = []
+        for signal, chance in zip(candidates, chances):
+            if isinstance(chance, Exception):
+                logger.error("%s 주문 가능 정보 조회 실패: %s", signal.market, chance)
+                continue
+            # 주문 가능 정보를 기다리는 동안 틱 기반 청산이 나갔을 수 있으므로 다시 확인한다.
+            if self._exit_blocked(signal.market) or not self.risk_engine.can_open_new_position(
+                signal.market, open_weights, total_weight
+            ):
                 continue
             price, volume = await self.execution.build_order(
                 signal.market,
@@ -135,14 +398,28 @@ class AutoTradingBot:
                 signal.entry,
                 signal.stop,
                 cash_available=self.state.cash,
+                chance=chance,
             )
             if volume <= 0:
                 continue
-            await self.execution.submit_limit_order(signal.market, signal.side, price, volume)
             weight = (price * volume) / self.state.equity if self.state.equity else 0
             open_weights[signal.market] = open_weights.get(signal.market, 0) + weight
+            total_weight += weight
             self.state.cash -= price * volume
-            self.state.positions[signal.market] = PositionSnapshot(
+            planned.append((signal, price, volume))
+        if not planned:
+            return
+
+        results = await asyncio.gather(
+            *(self.execution.submit_limit_order(s.market, s.side, price, volume) for s, price, volume in planned),
+            return_exceptions=True,
+        )
+        for (signal, price, volume), result in zip(planned, results):
+            if isinstance(result, Exception):
+                logger.error("%s 진입 주문 실패: %s", signal.market, result)
+                self.state.cash += price * volume
+                continue
+            position = PositionSnapshot(
                 market=signal.market,
                 side=signal.side,
                 entry_price=price,
@@ -151,22 +428,39 @@ class AutoTradingBot:
                 take_profit=signal.take_profit,
                 trailing=signal.trailing,
             )
+            self.state.add_position(position)
             logger.info("신규 진입 %s %s @ %.4f 수량 %.6f", signal.market, signal.side, price, volume)
 
     async def run_cycle(self) -> None:
         """단일 사이클: 계좌 갱신 → 유니버스/신호 → 청산 → 신규 진입."""
 
-        await self.refresh_portfolio()
-        universe = await self._select_universe()
-        signals = await self._generate_signals(universe)
+        # 계좌 갱신과 유니버스 조회는 서로 독립적이므로 동시에 진행한다.
+        universe, _ = await asyncio.gather(self._current_universe(), self._sync_positions())
+
+        # 유니버스와 겹치는 보유 마켓은 한 번만 조회해 신호 계산과 청산 점검이 공유한다.
+        # 그 밖의 보유 마켓은 스트림 틱으로 가격 조건을 보고, 지표 재계산이 필요할 때만 캔들을 조회한다.
+        needed = set(universe) | self._exit_frame_markets()
+        candles = await self.data.fetch_multi(needed, unit=5, count=200)
+        signals = await self._generate_signals(universe, candles)
 
-        await self._exit_checks(self.state.positions.keys())
+        await self._exit_checks(candles)
         await self._enter_positions(signals)
+        self.ticks.ensure(self.state.positions)
 
     async def run_forever(self, interval_sec: int = 60) -> None:
-        while True:
-            try:
-                await self.run_cycle()
-            except Exception as exc:  # noqa: BLE001
-                logger.exception("자동매매 사이클 오류: %s", exc)
-            await asyncio.sleep(interval_sec)
+        self.data.cache_ttl = interval_sec / 2
+        self._universe_runner = asyncio.create_task(self._universe_task(retry_sec=interval_sec))
+        try:
+            while True:
+                try:
+                    await self.run_cycle()
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception("자동매매 사이클 오류: %s", exc)
+                await asyncio.sleep(interval_sec)
+        finally:
+            self._universe_runner.cancel()
+            self._universe_runner = None
+            self.ticks.stop()
+            if self._scoring_pool is not None:
+                self._scoring_pool.shutdown(wait=False)
+                self._scoring_pool = None
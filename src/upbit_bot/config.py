@@ -4,7 +4,10 @@
 """
 from __future__ import annotations
 
-from pydantic import BaseSettings, Field
+from functools import lru_cache
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -14,23 +17,26 @@ class Settings(BaseSettings):
     - .env 파일을 사용해 로컬 개발 환경에서 값을 로드할 수 있다.
     """
 
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
+
     upbit_access_key: str = Field(..., description="업비트 Access Key")
     upbit_secret_key: str = Field(..., description="업비트 Secret Key")
     database_url: str = Field(..., description="SQLAlchemy 연결 문자열")
     redis_url: str | None = Field(None, description="선택적 Redis 캐시 URL")
 
     request_timeout: float = Field(10.0, description="REST 호출 타임아웃")
+    http_backend: str = Field("httpx", description="REST HTTP 백엔드 (httpx | aiohttp)")
     rest_base_url: str = Field("https://api.upbit.com", description="업비트 REST 기본 URL")
     websocket_url: str = Field("wss://api.upbit.com/websocket/v1", description="업비트 WebSocket URL")
 
     backtest_data_dir: str = Field("data/cache", description="백테스트/히스토리 데이터 저장 경로")
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """런타임에 단일 Settings 인스턴스를 제공한다."""
+    """런타임에 단일 Settings 인스턴스를 제공한다.
+
+    환경 변수·.env 파싱은 최초 호출 시 한 번만 수행하고 이후에는 캐시된 인스턴스를 반환한다.
+    """
 
     return Settings()
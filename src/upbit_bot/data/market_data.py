@@ -2,30 +2,66 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime, timedelta
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Callable, Iterable
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 
-from upbit_bot.adapters.upbit import Candle, UpbitClient
+from upbit_bot.adapters.upbit import UpbitClient, UpbitWebSocket
 from upbit_bot.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 
 class MarketUniverse:
-    """거래 가능한 KRW 마켓 리스트를 관리한다."""
+    """거래 가능한 KRW 마켓 리스트를 관리한다.
+
+    상장 마켓 목록은 자주 바뀌지 않으므로 cache_ttl(기본 10분) 동안 조회 결과를 재사용한다.
+    """
 
-    def __init__(self, client: UpbitClient | None = None):
+    def __init__(self, client: UpbitClient | None = None, cache_ttl: float = 600.0):
         self.client = client or UpbitClient()
+        self.cache_ttl = cache_ttl
+        self._cached: list[str] | None = None
+        self._cached_at = 0.0
+
+    def invalidate(self) -> None:
+        self._cached = None
+
+    @property
+    def cached_count(self) -> int | None:
+        """캐시된 KRW 마켓 수. 아직 조회 전이면 None."""
+
+        return None if self._cached is None else len(self._cached)
+
+    async def fetch_krw_markets(self, refresh: bool = False) -> list[str]:
+        if not refresh and self._cached is not None and time.monotonic() - self._cached_at < self.cache_ttl:
+            return list(self._cached)
 
-    async def fetch_krw_markets(self) -> list[str]:
         markets = await self.client.list_markets(is_details=True)
         krw = [m["market"] for m in markets if m["market"].startswith("KRW-") and not m.get("market_warning")]
-        return sorted(krw)
+        krw.sort()
+        self._cached = krw
+        self._cached_at = time.monotonic()
+        return list(krw)
 
 
 class CandleCache:
-    """OHLCV를 주기적으로 디스크에 캐시하여 백테스트 및 고속 조회에 사용한다."""
+    """OHLCV를 주기적으로 디스크에 캐시하여 백테스트 및 고속 조회에 사용한다.
+
+    비압축 Arrow IPC(Feather) 파일로 저장하고 메모리 맵으로 읽어 로드 시 복사를 줄인다.
+    갱신은 임시 파일을 원자적으로 교체하는 방식이라 이미 로드한 프레임은 바뀌지 않는다.
+    결측이 없는 수치 컬럼은 블록 통합 없이 변환해 메모리 맵 버퍼를 그대로 가리키는 배열이 된다.
+    """
 
     def __init__(self, base_dir: str | Path | None = None, client: UpbitClient | None = None):
         settings = get_settings()
@@ -34,19 +70,30 @@ class CandleCache:
         self.client = client or UpbitClient()
 
     def _path(self, market: str, unit: int) -> Path:
-        return self.base_dir / f"{market}_m{unit}.parquet"
+        return self.base_dir / f"{market}_m{unit}.arrow"
 
     async def refresh(self, market: str, unit: int = 1, count: int = 200) -> pd.DataFrame:
         candles = await self.client.minute_candles(market, unit=unit, count=count)
         frame = _candles_to_df(candles)
-        frame.to_parquet(self._path(market, unit), index=False)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        # load()가 반환한 프레임은 기존 파일의 메모리 맵을 가리키므로 제자리에서 덮어쓰지 않는다.
+        # 같은 디렉터리의 임시 파일에 쓴 뒤 os.replace로 교체하면 기존 맵은 이전 inode를 계속 본다.
+        path = self._path(market, unit)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            feather.write_feather(table, tmp, compression="uncompressed")
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
         return frame
 
     def load(self, market: str, unit: int = 1) -> pd.DataFrame:
         path = self._path(market, unit)
         if not path.exists():
             raise FileNotFoundError(f"캐시가 없습니다: {path}")
-        return pd.read_parquet(path)
+        table = feather.read_table(pa.memory_map(str(path), "r"))
+        return table.to_pandas(split_blocks=True)
 
 
 class UniverseFilter:
@@ -66,47 +113,247 @@ class UniverseFilter:
         tasks = [fetch_daily(m) for m in markets]
         results = await asyncio.gather(*tasks)
 
-        qualified: list[tuple[str, float]] = []
+        names: list[str] = []
+        averages: list[float] = []
         for market, candles in results:
             if not candles:
                 continue
-            avg_amount = sum(c.candle_acc_trade_price or 0 for c in candles) / len(candles)
-            if avg_amount >= self.min_krw_amount:
-                qualified.append((market, avg_amount))
+            amounts = np.fromiter(
+                (c.get("candle_acc_trade_price") or 0.0 for c in candles), dtype=np.float64, count=len(candles)
+            )
+            names.append(market)
+            averages.append(amounts.mean())
+        if not names:
+            return []
+
+        avgs = np.array(averages, dtype=np.float64)
+        order = np.argsort(-avgs, kind="stable")
+        qualified = np.array(names)[order][avgs[order] >= self.min_krw_amount]
+        return qualified[:top_n].tolist()
+
+
+class CandleBuffer:
+    """마켓 하나의 OHLCV를 float32 SoA 링 버퍼로 보관한다.
+
+    필드마다 용량의 두 배 길이 배열을 두고 같은 값을 slot, slot+capacity에 함께 기록해
+    최근 구간을 복사 없이 연속 슬라이스로 꺼낼 수 있다.
+    업비트 캔들의 timestamp는 봉의 마지막 체결 시각이라 진행 중인 봉에서는 조회마다 커지므로,
+    bar_ms 단위로 내림한 봉 시작 시각(int64 ms)으로 봉을 식별해 timestamp 컬럼에 둔다.
+    스코어 계산용이므로 주문 가격에 쓰는 마지막 종가만 last_close(float64)로 따로 둔다.
+    """
+
+    FIELDS = ("open", "high", "low", "close", "volume")
+    __slots__ = ("capacity", "bar_ms", "size", "last_close", "_next", "timestamp", *FIELDS)
+
+    def __init__(self, capacity: int = 200, bar_ms: int = 5 * 60_000):
+        self.capacity = capacity
+        self.bar_ms = bar_ms
+        self.size = 0
+        self.last_close = float("nan")
+        self._next = 0
+        self.timestamp = np.zeros(capacity * 2, dtype=np.int64)
+        for name in self.FIELDS:
+            setattr(self, name, np.full(capacity * 2, np.nan, dtype=np.float32))
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def last_ts(self) -> int | None:
+        if not self.size:
+            return None
+        return int(self.timestamp[(self._next - 1) % self.capacity])
+
+    def push(self, ts: int, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """봉 하나를 기록한다. 마지막 봉과 시작 시각이 같으면 진행 중인 봉으로 보고 덮어쓴다."""
+
+        ts -= ts % self.bar_ms
+        last = self.last_ts
+        if last is not None and ts < last:
+            return
+        if last is not None and ts == last:
+            slot = (self._next - 1) % self.capacity
+        else:
+            slot = self._next
+            self._next = (self._next + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+
+        for i in (slot, slot + self.capacity):
+            self.timestamp[i] = ts
+            self.open[i] = open_
+            self.high[i] = high
+            self.low[i] = low
+            self.close[i] = close
+            self.volume[i] = volume
+        self.last_close = float(close)
+
+    def extend_frame(self, frame: pd.DataFrame) -> None:
+        """_candles_to_df 프레임에서 마지막 기록 봉 이후(같은 봉 포함)의 봉만 반영한다."""
+
+        if frame.empty:
+            return
+        ts = frame["timestamp"].to_numpy(dtype="datetime64[ms]").view(np.int64)
+        ts = ts - ts % self.bar_ms
+        start = 0
+        last = self.last_ts
+        if last is not None:
+            start = int(np.searchsorted(ts, last))
+        if start >= len(ts):
+            return
+        values = frame[list(self.FIELDS)].to_numpy(dtype=np.float32)[start:].tolist()
+        for t, row in zip(ts[start:].tolist(), values):
+            self.push(t, *row)
+        self.last_close = float(frame["close"].iat[-1])
+
+    def view(self, name: str) -> np.ndarray:
+        """필드의 최근 size개를 시간순 연속 뷰로 반환한다."""
 
-        qualified.sort(key=lambda x: x[1], reverse=True)
-        return [m for m, _ in qualified[:top_n]]
+        start = (self._next - self.size) % self.capacity
+        return getattr(self, name)[start : start + self.size]
 
 
 class MarketDataService:
-    """멀티 타임프레임 캔들을 수집하고 가공한다."""
+    """멀티 타임프레임 캔들을 수집하고 가공한다.
 
-    def __init__(self, client: UpbitClient | None = None):
+    cache_ttl(초)이 0보다 크면 (market, unit, count) 단위로 변환된 프레임을 잠시 보관해
+    같은 사이클 안에서 반복되는 REST 조회를 생략한다.
+    조회한 캔들은 (market, unit)별 CandleBuffer에도 누적해 배치 스코어링이 float32 배열을 바로 쓰게 한다.
+    """
+
+    def __init__(self, client: UpbitClient | None = None, cache_ttl: float = 0.0):
         self.client = client or UpbitClient()
+        self.cache_ttl = cache_ttl
+        self._cache: dict[tuple[str, int, int], tuple[float, pd.DataFrame]] = {}
+        self._buffers: dict[tuple[str, int], CandleBuffer] = {}
+
+    def buffer(self, market: str, unit: int = 5) -> CandleBuffer | None:
+        return self._buffers.get((market, unit))
 
     async def fetch_recent(self, market: str, unit: int = 5, count: int = 200) -> pd.DataFrame:
+        key = (market, unit, count)
+        if self.cache_ttl > 0:
+            cached = self._cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+                return cached[1]
+
         candles = await self.client.minute_candles(market, unit=unit, count=count)
-        return _candles_to_df(candles)
+        frame = _candles_to_df(candles)
+        buffer = self._buffers.get((market, unit))
+        if buffer is None or buffer.capacity < count:
+            buffer = self._buffers[(market, unit)] = CandleBuffer(count, bar_ms=unit * 60_000)
+        buffer.extend_frame(frame)
+        if self.cache_ttl > 0:
+            self._cache[key] = (time.monotonic(), frame)
+        return frame
 
     async def fetch_multi(self, markets: Iterable[str], unit: int = 5, count: int = 200) -> dict[str, pd.DataFrame]:
+        markets = list(markets)
         tasks = [self.fetch_recent(market, unit=unit, count=count) for market in markets]
         results = await asyncio.gather(*tasks)
         return {market: frame for market, frame in zip(markets, results)}
 
 
-def _candles_to_df(candles: list[Candle]) -> pd.DataFrame:
+@dataclass
+class LatestTick:
+    market: str
+    trade_price: float
+    trade_timestamp: int
+    received_at: float
+
+
+class TickerStream:
+    """WebSocket ticker 푸시로 마켓별 최신 체결가를 메모리에 유지한다.
+
+    - ensure()로 구독 마켓 집합을 맞추면 백그라운드 태스크가 연결·재연결을 관리한다.
+    - on_tick 콜백이 있으면 프레임마다 호출해 호가 변동에 즉시 반응할 수 있게 한다.
+    """
+
+    def __init__(
+        self,
+        ws: UpbitWebSocket | None = None,
+        on_tick: Callable[[LatestTick], None] | None = None,
+        max_age: float = 60.0,
+        reconnect_delay: float = 1.0,
+    ):
+        self.ws = ws or UpbitWebSocket()
+        self.on_tick = on_tick
+        self.max_age = max_age
+        self.reconnect_delay = reconnect_delay
+        self.latest: dict[str, LatestTick] = {}
+        self._codes: frozenset[str] = frozenset()
+        self._task: asyncio.Task | None = None
+
+    def get(self, market: str) -> LatestTick | None:
+        """max_age 이내에 수신한 최신 틱. 오래되었거나 없으면 None."""
+
+        tick = self.latest.get(market)
+        if tick is None or time.monotonic() - tick.received_at > self.max_age:
+            return None
+        return tick
+
+    def ensure(self, markets: Iterable[str]) -> None:
+        codes = frozenset(markets)
+        if codes == self._codes and self._task is not None and not self._task.done():
+            return
+        self.stop()
+        self._codes = codes
+        if codes:
+            self._task = asyncio.create_task(self._run(sorted(codes)))
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, codes: list[str]) -> None:
+        tickets = [{"ticket": str(uuid.uuid4())}, {"type": "ticker", "codes": codes}]
+        while True:
+            try:
+                async for frame in self.ws.subscribe(tickets):
+                    self._handle(orjson.loads(frame))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("ticker 스트림 재연결: %s", exc)
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _handle(self, msg: dict[str, Any]) -> None:
+        if msg.get("type") != "ticker":
+            return
+        tick = LatestTick(
+            market=msg["code"],
+            trade_price=float(msg["trade_price"]),
+            trade_timestamp=int(msg.get("trade_timestamp", 0)),
+            received_at=time.monotonic(),
+        )
+        self.latest[tick.market] = tick
+        if self.on_tick is not None:
+            self.on_tick(tick)
+
+
+def _candles_to_df(candles: list[dict[str, Any]]) -> pd.DataFrame:
+    """디코딩된 캔들 dict 목록을 컬럼 단위 배열로 한 번에 변환한다.
+
+    업비트는 최신 캔들부터 반환하므로 정렬 대신 배열을 뒤집어 오름차순으로 맞춘다.
+    """
+
+    n = len(candles)
+    nan = float("nan")
+
+    def column(key: str) -> np.ndarray:
+        values = (nan if (v := c.get(key)) is None else v for c in candles)
+        return np.fromiter(values, dtype=np.float64, count=n)[::-1]
+
+    ts = np.fromiter((c["timestamp"] for c in candles), dtype=np.int64, count=n)[::-1]
     return pd.DataFrame(
-        [
-            {
-                "market": c.market,
-                "timestamp": datetime.fromtimestamp(c.timestamp / 1000),
-                "open": c.opening_price,
-                "high": c.high_price,
-                "low": c.low_price,
-                "close": c.trade_price,
-                "turnover": c.candle_acc_trade_price,
-                "volume": c.candle_acc_trade_volume,
-            }
-            for c in candles
-        ]
-    ).sort_values("timestamp")
+        {
+            "market": candles[0]["market"] if candles else "",
+            "timestamp": pd.to_datetime(ts, unit="ms"),
+            "open": column("opening_price"),
+            "high": column("high_price"),
+            "low": column("low_price"),
+            "close": column("trade_price"),
+            "turnover": column("candle_acc_trade_price"),
+            "volume": column("candle_acc_trade_volume"),
+        }
+    )
@@ -3,14 +3,24 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Callable
+from typing import Any, Callable
+
+import numpy as np
 
 from upbit_bot.adapters.upbit import OrderSide, UpbitClient
 from upbit_bot.risk.engine import RiskEngine
 
 logger = logging.getLogger(__name__)
 
+# KRW 마켓 호가 단위: 가격이 _BAND_UPPER[i] 미만인 첫 구간의 _BAND_TICK[i]를 사용한다.
+_BAND_UPPER_LIST = [10, 100, 1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 2_000_000]
+_BAND_TICK_LIST = [0.01, 0.1, 1, 5, 10, 50, 100, 500, 1000, 2000]
+_BAND_UPPER = np.array(_BAND_UPPER_LIST, dtype=np.float64)
+_BAND_TICK = np.array(_BAND_TICK_LIST, dtype=np.float64)
+
 
 @dataclass
 class ExecutionResult:
@@ -21,45 +31,81 @@ class ExecutionResult:
     volume: float
 
 
+@dataclass
+class ChanceInfo:
+    """/v1/orders/chance 응답 중 주문 계산에 쓰는 값."""
+
+    min_total: float
+    bid_fee: float
+    ask_fee: float
+
+    @classmethod
+    def from_payload(cls, chance: dict[str, Any]) -> ChanceInfo:
+        return cls(
+            min_total=float(chance.get("market", {}).get("bid", {}).get("min_total", 0)),
+            bid_fee=float(chance["bid_fee"]),
+            ask_fee=float(chance["ask_fee"]),
+        )
+
+
 class ExecutionEngine:
-    def __init__(self, client: UpbitClient | None = None, risk_engine: RiskEngine | None = None):
+    def __init__(
+        self,
+        client: UpbitClient | None = None,
+        risk_engine: RiskEngine | None = None,
+        chance_ttl: float = 300.0,
+    ):
         self.client = client or UpbitClient()
         self.risk_engine = risk_engine
+        self.chance_ttl = chance_ttl
+        self._chance_cache: dict[str, tuple[float, ChanceInfo]] = {}
 
     def _tick_size(self, price: float) -> float:
-        if price < 10:
-            return 0.01
-        if price < 100:
-            return 0.1
-        if price < 1000:
-            return 1
-        if price < 10000:
-            return 5
-        if price < 50000:
-            return 10
-        if price < 100000:
-            return 50
-        if price < 500000:
-            return 100
-        if price < 1000000:
-            return 500
-        if price < 2000000:
-            return 1000
-        return 2000
+        return _BAND_TICK_LIST[bisect_right(_BAND_UPPER_LIST, price)]
 
     def align_price(self, price: float) -> float:
         tick = self._tick_size(price)
         return round(price / tick) * tick
 
-    async def build_order(self, market: str, side: str, entry: float, stop: float, cash_available: float) -> tuple[float, float]:
-        """틱 사이즈, 최소 주문금액, 리스크를 반영한 주문 가격/수량 계산."""
+    def align_prices(self, prices: np.ndarray) -> np.ndarray:
+        """여러 가격을 한 번에 호가 단위로 정렬한다."""
+
+        prices = np.asarray(prices, dtype=np.float64)
+        ticks = _BAND_TICK[np.searchsorted(_BAND_UPPER, prices, side="right")]
+        return np.round(prices / ticks) * ticks
+
+    async def chance_info(self, market: str) -> ChanceInfo:
+        """마켓별 주문 가능 정보. 수수료·최소 주문금액은 거의 바뀌지 않으므로 chance_ttl 동안 재사용한다."""
+
+        cached = self._chance_cache.get(market)
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < self.chance_ttl:
+            return cached[1]
+        info = ChanceInfo.from_payload(await self.client.order_chance(market))
+        self._chance_cache[market] = (now, info)
+        return info
+
+    async def build_order(
+        self,
+        market: str,
+        side: str,
+        entry: float,
+        stop: float,
+        cash_available: float,
+        chance: ChanceInfo | None = None,
+    ) -> tuple[float, float]:
+        """틱 사이즈, 최소 주문금액, 리스크를 반영한 주문 가격/수량 계산.
+
+        chance를 미리 조회해 넘기면 주문 가능 정보 조회를 생략한다.
+        """
 
         if not self.risk_engine:
             raise RuntimeError("RiskEngine이 필요합니다")
 
-        chance = await self.client.order_chance(market)
-        min_total = max(30000.0, float(chance.get("market", {}).get("bid", {}).get("min_total", 0)))
-        fee = float(chance["bid_fee"] if side == "buy" else chance["ask_fee"])
+        if chance is None:
+            chance = await self.chance_info(market)
+        min_total = max(30000.0, chance.min_total)
+        fee = chance.bid_fee if side == "buy" else chance.ask_fee
 
         price = self.align_price(entry)
         volume = self.risk_engine.position_size(price, stop)
@@ -86,6 +132,10 @@ class ExecutionEngine:
             volume=volume,
         )
 
+    async def cancel_order(self, order_uuid: str) -> None:
+        await self.client.cancel_order(order_uuid)
+        logger.info("주문 취소 완료 %s", order_uuid)
+
     def size_with_risk(self, entry: float, stop: float) -> float:
         if not self.risk_engine:
             return 0.0
@@ -25,13 +25,20 @@ class RiskEngine:
     def reset_daily(self) -> None:
         self.daily_loss = 0.0
 
-    def can_open_new_position(self, market: str, open_positions: dict[str, float]) -> bool:
+    def can_open_new_position(
+        self, market: str, open_positions: dict[str, float], total_weight: float | None = None
+    ) -> bool:
+        """신규 진입 가능 여부.
+
+        total_weight를 넘기면 open_positions 합계를 다시 계산하지 않고 그 값을 사용한다.
+        """
+
         equity = self.equity_provider()
         if equity <= 0:
             return False
         if len(open_positions) >= self.limits.max_positions:
             return False
-        current_weight = sum(open_positions.values())
+        current_weight = sum(open_positions.values()) if total_weight is None else total_weight
         if current_weight >= self.limits.max_total_exposure_pct:
             return False
         if market in open_positions and open_positions[market] >= self.limits.max_position_pct:
@@ -1,18 +1,33 @@
 """대시보드용 FastAPI 엔드포인트."""
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
 from fastapi import Depends, FastAPI, HTTPException
 
 from upbit_bot.adapters.upbit import UpbitClient
 from upbit_bot.config import get_settings
 
-app = FastAPI(title="Upbit Trading Bot")
 
+@lru_cache(maxsize=1)
+def get_client() -> UpbitClient:
+    """요청 간 커넥션 풀을 공유하도록 프로세스 단위 UpbitClient를 재사용한다."""
 
-def get_client():
     return UpbitClient()
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    if get_client.cache_info().currsize:
+        await get_client().close()
+        get_client.cache_clear()
+
+
+app = FastAPI(title="Upbit Trading Bot", lifespan=lifespan)
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
@@ -2,75 +2,121 @@
 from __future__ import annotations
 
 from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, create_engine
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy import ForeignKey, Index, create_engine, event, insert
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship, sessionmaker
 
 from upbit_bot.config import get_settings
 
-Base = declarative_base()
+# WAL로 읽기와 쓰기가 서로 막지 않게 하고, 임시 테이블은 메모리에 둔다.
+_SQLITE_PRAGMAS = ("journal_mode=WAL", "synchronous=NORMAL", "temp_store=MEMORY")
+# 서버형 DB용 커넥션 풀 크기. SQLite는 드라이버 기본 풀을 그대로 쓴다.
+_POOL_OPTIONS = {"pool_size": 5, "max_overflow": 10}
+
+
+class Base(DeclarativeBase):
+    pass
 
 
 class AccountSnapshot(Base):
     __tablename__ = "accounts_snapshot"
 
-    id = Column(Integer, primary_key=True)
-    captured_at = Column(DateTime, default=datetime.utcnow, index=True)
-    total_balance = Column(Float)
-    equity = Column(Float)
-    cash = Column(Float)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    captured_at: Mapped[datetime | None] = mapped_column(default=datetime.utcnow, index=True)
+    total_balance: Mapped[float | None]
+    equity: Mapped[float | None]
+    cash: Mapped[float | None]
 
 
 class Position(Base):
     __tablename__ = "positions"
+    __table_args__ = (Index("ix_positions_market_opened_at", "market", "opened_at"),)
 
-    id = Column(Integer, primary_key=True)
-    market = Column(String, index=True)
-    avg_price = Column(Float)
-    volume = Column(Float)
-    opened_at = Column(DateTime, default=datetime.utcnow)
-    take_profit = Column(Float)
-    stop_loss = Column(Float)
-    trailing = Column(Float)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    market: Mapped[str | None]
+    avg_price: Mapped[float | None]
+    volume: Mapped[float | None]
+    opened_at: Mapped[datetime | None] = mapped_column(default=datetime.utcnow)
+    take_profit: Mapped[float | None]
+    stop_loss: Mapped[float | None]
+    trailing: Mapped[float | None]
 
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (Index("ix_orders_market_state", "market", "state"),)
 
-    id = Column(Integer, primary_key=True)
-    uuid = Column(String, unique=True, index=True)
-    market = Column(String, index=True)
-    side = Column(String)
-    price = Column(Float)
-    volume = Column(Float)
-    state = Column(String, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    uuid: Mapped[str | None] = mapped_column(unique=True, index=True)
+    market: Mapped[str | None]
+    side: Mapped[str | None]
+    price: Mapped[float | None]
+    volume: Mapped[float | None]
+    state: Mapped[str | None] = mapped_column(index=True)
+    created_at: Mapped[datetime | None] = mapped_column(default=datetime.utcnow)
+    updated_at: Mapped[datetime | None] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    trades: Mapped[list[Trade]] = relationship(back_populates="order")
 
 
 class Trade(Base):
     __tablename__ = "trades"
+    __table_args__ = (Index("ix_trades_order_executed", "order_id", "executed_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    order_id: Mapped[int | None] = mapped_column(ForeignKey("orders.id"))
+    price: Mapped[float | None]
+    volume: Mapped[float | None]
+    fee: Mapped[float | None]
+    executed_at: Mapped[datetime | None] = mapped_column(default=datetime.utcnow)
 
-    id = Column(Integer, primary_key=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    price = Column(Float)
-    volume = Column(Float)
-    fee = Column(Float)
-    executed_at = Column(DateTime, default=datetime.utcnow)
+    order: Mapped[Order | None] = relationship(back_populates="trades")
 
-    order = relationship("Order", backref="trades")
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in _SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """프로세스 전체가 공유하는 엔진. 세션마다 새로 만들면 커넥션 풀이 재사용되지 않는다."""
 
-def get_engine():
     settings = get_settings()
-    return create_engine(settings.database_url, future=True)
+    url = make_url(settings.database_url)
+    if url.get_backend_name() == "sqlite":
+        engine = create_engine(url, future=True, pool_pre_ping=True)
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+    return create_engine(url, future=True, pool_pre_ping=True, **_POOL_OPTIONS)
 
 
-def create_session():
-    engine = get_engine()
-    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+@lru_cache(maxsize=1)
+def _session_factory() -> sessionmaker[Session]:
+    return sessionmaker(bind=get_engine(), autoflush=False, expire_on_commit=False)
+
+
+def create_session() -> Session:
+    return _session_factory()()
 
 
 def init_db():
     engine = get_engine()
     Base.metadata.create_all(engine)
+
+
+def bulk_insert(session: Session, model: type[Base], rows: Iterable[dict[str, Any]]) -> None:
+    """여러 행을 executemany 한 번으로 넣는다. 커밋은 호출자가 한다."""
+
+    rows = list(rows)
+    if rows:
+        session.execute(insert(model), rows)
+
+
+def bulk_record_trades(session: Session, rows: Iterable[dict[str, Any]]) -> None:
+    bulk_insert(session, Trade, rows)
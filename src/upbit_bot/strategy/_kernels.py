@@ -0,0 +1,228 @@
+"""전략 지표 계산용 Numba 커널.
+
+모든 커널은 기존 pandas 구현과 같은 값을 내도록 작성한다.
+- EMA: ewm(span, adjust=True).mean()
+- RSI/ATR/거래량: rolling(window).mean()의 마지막 값
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Callable, NamedTuple
+
+import numpy as np
+from numba import njit, prange
+
+# 결측 거래량(NaN)과 RSI의 loss=0 → inf 처리를 유지하기 위해 nnan/ninf 플래그는 제외하고,
+# 0 나눗셈도 예외 대신 pandas처럼 inf/NaN이 되도록 error_model="numpy"를 쓴다.
+FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+# 3차원 캔들 배열 (마켓, 캔들, 필드)의 필드 순서
+FIELDS = ("open", "high", "low", "close", "volume")
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(FIELDS))
+
+MIN_CANDLES = 60
+ATR_WINDOW = 14
+VOLUME_WINDOW = 30
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+
+
+class KernelParams(NamedTuple):
+    """커널에 넘기는 EMA 계수(alpha = 2 / (span + 1))와 롤링 윈도.
+
+    엔진 생성 시 한 번 만들어 두고 매 호출에 그대로 넘긴다.
+    """
+
+    a_fast: float
+    a_slow: float
+    a_macd_fast: float
+    a_macd_slow: float
+    a_signal: float
+    rsi_window: int
+    atr_window: int
+    volume_window: int
+
+
+def make_params(span_fast: int, span_slow: int, rsi_window: int) -> KernelParams:
+    return KernelParams(
+        2.0 / (span_fast + 1.0),
+        2.0 / (span_slow + 1.0),
+        2.0 / (MACD_FAST + 1.0),
+        2.0 / (MACD_SLOW + 1.0),
+        2.0 / (MACD_SIGNAL + 1.0),
+        int(rsi_window),
+        ATR_WINDOW,
+        VOLUME_WINDOW,
+    )
+
+
+@njit(fastmath=FASTMATH, error_model="numpy", cache=True, nogil=True)
+def _ewm_update(mean, weight, x, decay):
+    """ewm(adjust=True)의 pandas 갱신식. 값이 평균과 같으면 건너뛰어 상수열이 오차 없이 유지된다."""
+
+    weight *= decay
+    if mean != x:
+        mean = (weight * mean + x) / (weight + 1.0)
+    return mean, weight + 1.0
+
+
+@njit(fastmath=FASTMATH, error_model="numpy", cache=True, nogil=True)
+def compute_all(high, low, close, volume, params):
+    """캔들 배열을 한 번만 순회하며 마지막 봉 기준 지표를 모두 계산한다.
+
+    반환: (trend, momentum, macd_hist, rsi, vol_ratio, atr). 구간이 부족한 지표는 NaN.
+    롤링 지표는 전체 길이 n을 미리 알기 때문에 마지막 window 구간에서만 누적한다.
+    """
+
+    n = close.shape[0]
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan, np.nan, np.nan
+
+    d_fast = 1.0 - params.a_fast
+    d_slow = 1.0 - params.a_slow
+    d_macd_fast = 1.0 - params.a_macd_fast
+    d_macd_slow = 1.0 - params.a_macd_slow
+    d_signal = 1.0 - params.a_signal
+    rsi_window = params.rsi_window
+    atr_window = params.atr_window
+    volume_window = params.volume_window
+    ema_fast = ema_slow = ema_mf = ema_ms = close[0]
+    w_fast = w_slow = w_mf = w_ms = w_sig = 0.0
+    macd = signal = 0.0
+
+    rsi_start = n - rsi_window
+    atr_start = n - atr_window
+    vol_start = n - volume_window
+    gain = loss = tr_sum = vol_sum = 0.0
+    vol_last = 0.0
+
+    for i in range(n):
+        c = close[i]
+        ema_fast, w_fast = _ewm_update(ema_fast, w_fast, c, d_fast)
+        ema_slow, w_slow = _ewm_update(ema_slow, w_slow, c, d_slow)
+
+        ema_mf, w_mf = _ewm_update(ema_mf, w_mf, c, d_macd_fast)
+        ema_ms, w_ms = _ewm_update(ema_ms, w_ms, c, d_macd_slow)
+        macd = ema_mf - ema_ms
+        signal, w_sig = _ewm_update(signal, w_sig, macd, d_signal)
+
+        if i > 0 and i >= rsi_start:
+            delta = c - close[i - 1]
+            if delta > 0:
+                gain += delta
+            else:
+                loss -= delta
+
+        if i >= atr_start:
+            tr = high[i] - low[i]
+            if i > 0:
+                tr = max(tr, abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+            tr_sum += tr
+
+        # 거래량은 ffill → fillna(0) 규칙으로 결측을 메운다.
+        v = volume[i]
+        if not np.isnan(v):
+            vol_last = v
+        if i >= vol_start:
+            vol_sum += vol_last
+
+    last = close[n - 1]
+    trend = (ema_fast - ema_slow) / last
+    momentum = last / close[n - 10] - 1.0 if n >= 10 else np.nan
+    hist = macd - signal
+
+    if n <= rsi_window:
+        rsi = np.nan
+    elif loss == 0.0:
+        # pandas 구현은 loss=0을 inf로 바꿔 rs=0 → RSI=0이 된다.
+        rsi = 0.0
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+
+    atr = tr_sum / atr_window if n >= atr_window else np.nan
+
+    if n >= volume_window:
+        vol_mean = vol_sum / volume_window
+        if vol_mean == 0.0:
+            vol_mean = 1.0
+        vol_ratio = vol_last / vol_mean - 1.0
+    else:
+        vol_ratio = np.nan
+
+    return trend, momentum, hist, rsi, vol_ratio, atr
+
+
+@njit(fastmath=FASTMATH, error_model="numpy", cache=True, nogil=True)
+def score_indicators(trend, momentum, hist, rsi, vol_ratio, atr):
+    """compute_all 결과를 가중 합산한 점수. ATR이 0 이하(또는 NaN)면 0."""
+
+    quality = 1.0 if atr > 0 else 0.0
+    rsi_bias = (rsi - 50.0) / 50.0
+    return (trend * 0.35 + momentum * 0.25 + hist * 0.2 + rsi_bias * 0.1 + vol_ratio * 0.1) * quality
+
+
+@njit(fastmath=FASTMATH, error_model="numpy", cache=True, nogil=True)
+def score_one(high, low, close, volume, params):
+    """단일 마켓의 (score, atr). 캔들이 부족하면 (0, nan)."""
+
+    if close.shape[0] < MIN_CANDLES:
+        return 0.0, np.nan
+
+    trend, momentum, hist, rsi, vol_ratio, atr = compute_all(high, low, close, volume, params)
+    return score_indicators(trend, momentum, hist, rsi, vol_ratio, atr), atr
+
+
+class ScoreKernels(NamedTuple):
+    """특정 KernelParams로 특화된 커널 쌍."""
+
+    compute: Callable  # (high, low, close, volume) -> compute_all 결과
+    batch: Callable  # (data, lengths) -> (scores, atrs)
+
+
+@lru_cache(maxsize=None)
+def make_score_kernel(params: KernelParams) -> ScoreKernels:
+    """params를 컴파일 타임 상수로 묶은 커널 쌍을 만든다.
+
+    클로저가 잡은 params는 Numba가 상수로 고정하므로 LLVM이 윈도 경계와 EMA 계수를 접어 넣을 수 있다.
+    같은 설정이면 만들어 둔 쌍을 돌려주고, 디스크 캐시도 params 값마다 따로 저장된다.
+    """
+
+    @njit(fastmath=FASTMATH, error_model="numpy", cache=True, nogil=True)
+    def compute(high, low, close, volume):
+        return compute_all(high, low, close, volume, params)
+
+    @njit(parallel=True, fastmath=FASTMATH, error_model="numpy", cache=True, nogil=True)
+    def batch(data, lengths):
+        """(마켓, 캔들, 필드) 배열을 마켓 축으로 병렬 스코어링한다.
+
+        각 마켓의 유효 캔들은 캔들 축의 뒤쪽 lengths[m]개에 오른쪽 정렬되어 있어야 한다.
+        반복마다 지역 스칼라만 쓰고 결과 배열의 자기 칸에만 기록하므로 공유 상태가 없고,
+        nogil이라 워커 스레드에서 호출하면 이벤트 루프 스레드가 계속 I/O를 처리할 수 있다.
+        """
+
+        n_markets = data.shape[0]
+        n_candles = data.shape[1]
+        scores = np.zeros(n_markets)
+        atrs = np.full(n_markets, np.nan)
+        for m in prange(n_markets):
+            start = n_candles - lengths[m]
+            block = data[m, start:]
+            score, atr = score_one(block[:, HIGH], block[:, LOW], block[:, CLOSE], block[:, VOLUME], params)
+            scores[m] = score
+            atrs[m] = atr
+        return scores, atrs
+
+    # 배치 스코어링은 float32 캔들 배열, 단일 마켓 경로는 float64 배열로 호출되므로 각각 미리 컴파일한다.
+    dummy = np.zeros(2)
+    compute(dummy, dummy, dummy, dummy)
+    batch(np.zeros((1, 2, len(FIELDS)), dtype=np.float32), np.array([2], dtype=np.int64))
+    return ScoreKernels(compute, batch)
+
+
+def _warmup() -> None:
+    """임포트 시점에 컴파일(또는 디스크 캐시 로드)을 끝내 첫 실거래 호출이 JIT 비용을 치르지 않게 한다."""
+
+    score_indicators(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    make_score_kernel(make_params(21, 55, 14))
+
+
+_warmup()
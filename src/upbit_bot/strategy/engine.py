@@ -2,12 +2,25 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterable, Mapping
 
+import numpy as np
 import pandas as pd
 
+from upbit_bot.strategy._kernels import (
+    FIELDS,
+    MIN_CANDLES,
+    make_params,
+    make_score_kernel,
+    score_indicators,
+)
 
-@dataclass
+if TYPE_CHECKING:
+    from upbit_bot.data.market_data import CandleBuffer
+
+
+@dataclass(slots=True, frozen=True)
 class Signal:
     market: str
     side: str  # "buy" or "sell"
@@ -18,7 +31,7 @@ class Signal:
     trailing: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PositionSnapshot:
     market: str
     side: str
@@ -29,65 +42,91 @@ class PositionSnapshot:
     trailing: float
 
 
+@dataclass(slots=True)
+class IndicatorBundle:
+    """마지막 봉 기준 지표 묶음. 한 번 계산해 스코어링과 청산 판단이 함께 쓴다."""
+
+    length: int
+    close: float
+    trend: float
+    momentum: float
+    hist: float
+    rsi: float
+    vol_ratio: float
+    atr: float
+
+    @property
+    def score(self) -> float:
+        """캔들이 MIN_CANDLES보다 적으면 0."""
+
+        if self.length < MIN_CANDLES:
+            return 0.0
+        return float(
+            score_indicators(self.trend, self.momentum, self.hist, self.rsi, self.vol_ratio, self.atr)
+        )
+
+
 class StrategyEngine:
     """EMA, RSI, MACD, 변동성 지표를 결합한 신호 엔진."""
 
     def __init__(self):
         self.indicator_windows = {"ema_fast": 21, "ema_slow": 55, "rsi": 14}
+        # 배치 스코어링용 (마켓, 캔들, 필드) 배열을 매 사이클 새로 만들지 않도록 평탄한 버퍼를 재사용한다.
+        self._stack_buf = np.empty(0, dtype=np.float32)
 
-    def _rsi(self, close: pd.Series, window: int) -> pd.Series:
-        delta = close.diff()
-        gain = delta.clip(lower=0).rolling(window).mean()
-        loss = -delta.clip(upper=0).rolling(window).mean()
-        rs = gain / loss.replace(0, float("inf"))
-        return 100 - (100 / (1 + rs))
-
-    def _atr(self, frame: pd.DataFrame, window: int = 14) -> pd.Series:
-        high_low = frame["high"] - frame["low"]
-        high_close = (frame["high"] - frame["close"].shift()).abs()
-        low_close = (frame["low"] - frame["close"].shift()).abs()
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        return tr.rolling(window).mean()
-
-    def _macd(self, close: pd.Series) -> tuple[pd.Series, pd.Series, pd.Series]:
-        ema_fast = close.ewm(span=12).mean()
-        ema_slow = close.ewm(span=26).mean()
-        macd = ema_fast - ema_slow
-        signal = macd.ewm(span=9).mean()
-        hist = macd - signal
-        return macd, signal, hist
+    @property
+    def indicator_windows(self) -> Mapping[str, int]:
+        """읽기 전용 지표 윈도. 바꾸려면 새 매핑을 통째로 대입한다."""
 
-    def score_market(self, candles: pd.DataFrame) -> float:
-        if len(candles) < 60:
-            return 0.0
+        return MappingProxyType(self._windows)
 
-        close = candles["close"]
-        volume = candles["volume"].fillna(method="ffill").fillna(0)
+    @indicator_windows.setter
+    def indicator_windows(self, windows: Mapping[str, int]) -> None:
+        # EMA 계수와 윈도는 대입 시점에 한 번만 계산하고, 그 값을 상수로 박아 넣은 특화 커널을 만들어 둔다.
+        windows = dict(windows)
+        params = make_params(windows["ema_fast"], windows["ema_slow"], windows["rsi"])
+        self._windows = windows
+        self._params = params
+        self._kernels = make_score_kernel(params)
 
-        ema_fast = close.ewm(span=self.indicator_windows["ema_fast"]).mean()
-        ema_slow = close.ewm(span=self.indicator_windows["ema_slow"]).mean()
-        macd, _, hist = self._macd(close)
-        rsi = self._rsi(close, self.indicator_windows["rsi"])
-        atr = self._atr(candles)
+    def _compute_indicators(self, candles: pd.DataFrame, close_arr: np.ndarray | None = None) -> IndicatorBundle:
+        """마지막 봉 기준 지표를 융합 커널 한 번으로 계산한다.
 
-        trend_score = (ema_fast.iloc[-1] - ema_slow.iloc[-1]) / close.iloc[-1]
-        momentum_score = (close.iloc[-1] / close.iloc[-10]) - 1
-        volume_score = (volume.iloc[-1] / (volume.rolling(30).mean().iloc[-1] or 1)) - 1
-        quality = 1 if atr.iloc[-1] > 0 else 0
+        호출자가 이미 꺼낸 종가 배열이 있으면 close_arr로 넘겨 컬럼 조회를 반복하지 않는다.
+        """
 
-        macd_bias = hist.iloc[-1]
-        rsi_bias = (rsi.iloc[-1] - 50) / 50
+        n = len(candles)
+        if n == 0:
+            nan = float("nan")
+            return IndicatorBundle(0, nan, nan, nan, nan, nan, nan, nan)
+        if close_arr is None:
+            close_arr = candles["close"].to_numpy(dtype=np.float64)
+        close = np.ascontiguousarray(close_arr, dtype=np.float64)
+        values = self._kernels.compute(
+            _column(candles, "high"), _column(candles, "low"), close, _column(candles, "volume")
+        )
+        return IndicatorBundle(n, float(close[-1]), *values)
 
-        return float((trend_score * 0.35 + momentum_score * 0.25 + macd_bias * 0.2 + rsi_bias * 0.1 + volume_score * 0.1) * quality)
+    def score_market(self, candles: pd.DataFrame) -> float:
+        # 신규 상장 등 이력이 짧은 마켓은 지표를 계산하지 않고 바로 0점 처리한다.
+        if candles.shape[0] < MIN_CANDLES:
+            return 0.0
+        return self._compute_indicators(candles).score
 
-    def generate_entry_signal(self, market: str, candles: pd.DataFrame) -> Signal | None:
-        score = self.score_market(candles)
-        if score == 0:
-            return None
+    def score_markets(self, candles_matrix: np.ndarray, lengths: np.ndarray | None = None) -> np.ndarray:
+        """(마켓, 캔들, 필드) 배열을 한 번의 커널 호출로 스코어링해 float32 점수 배열을 돌려준다.
+
+        필드 순서는 FIELDS(open, high, low, close, volume). lengths가 없으면 모든 마켓이 캔들 축 전체를 쓴다.
+        """
 
-        close = candles["close"].iloc[-1]
-        atr = self._atr(candles).iloc[-1]
+        if candles_matrix.ndim != 3 or candles_matrix.shape[2] != len(FIELDS):
+            raise ValueError(f"candles_matrix는 (M, N, {len(FIELDS)}) 형태여야 합니다: {candles_matrix.shape}")
+        if lengths is None:
+            lengths = np.full(candles_matrix.shape[0], candles_matrix.shape[1], dtype=np.int64)
+        scores, _ = self._kernels.batch(np.ascontiguousarray(candles_matrix), np.asarray(lengths, dtype=np.int64))
+        return scores.astype(np.float32)
 
+    def _build_signal(self, market: str, score: float, close: float, atr: float) -> Signal:
         if score > 0:
             stop = max(close - atr * 2, close * 0.97)
             take_profit = close + atr * 3
@@ -113,33 +152,106 @@ class StrategyEngine:
             trailing=atr * 1.5,
         )
 
+    def generate_entry_signal(self, market: str, candles: pd.DataFrame) -> Signal | None:
+        if candles.shape[0] < MIN_CANDLES:
+            return None
+
+        bundle = self._compute_indicators(candles)
+        score = bundle.score
+        if score == 0:
+            return None
+        return self._build_signal(market, score, bundle.close, bundle.atr)
+
+    def generate_entry_signals(self, frames: Mapping[str, pd.DataFrame | CandleBuffer]) -> dict[str, Signal]:
+        """여러 마켓의 진입 신호를 한 번에 계산한다.
+
+        프레임(또는 CandleBuffer)을 (마켓, 캔들, 필드) float32 배열로 쌓아 Numba 커널이 마켓 축을 병렬로
+        스코어링하고, 점수가 0이 아닌 마켓에 대해서만 Signal을 만든다. 진입가는 float64 종가를 쓴다.
+        """
+
+        markets = list(frames)
+        if not markets:
+            return {}
+
+        sources = [frames[m] for m in markets]
+        n_candles = max(len(f) for f in sources)
+        size = len(sources) * n_candles * len(FIELDS)
+        if self._stack_buf.size < size:
+            self._stack_buf = np.empty(size, dtype=np.float32)
+        out = self._stack_buf[:size].reshape(len(sources), n_candles, len(FIELDS))
+        data, lengths, closes = _stack_frames(sources, out=out)
+        scores, atrs = self._kernels.batch(data, lengths)
+        signals: dict[str, Signal] = {}
+        for i in np.flatnonzero(scores != 0).tolist():
+            market = markets[i]
+            signals[market] = self._build_signal(market, float(scores[i]), float(closes[i]), float(atrs[i]))
+        return signals
+
+    def price_exit(self, price: float, position: PositionSnapshot) -> bool:
+        """지표 없이 현재가만으로 판단 가능한 손절·트레일링·익절 조건."""
+
+        if position.side == "buy":
+            trailing_stop = max(position.stop, price - position.trailing)
+            return (price <= trailing_stop) | (price <= position.stop) | (price >= position.take_profit)
+
+        trailing_stop = min(position.stop, price + position.trailing)
+        return (price >= trailing_stop) | (price >= position.stop) | (price <= position.take_profit)
+
     def should_exit(self, candles: pd.DataFrame, position: PositionSnapshot) -> bool:
         """손절·익절·모멘텀 둔화 조건을 모두 확인."""
 
-        close = candles["close"].iloc[-1]
-        atr = self._atr(candles).iloc[-1]
-        macd, _, hist = self._macd(candles["close"])
-        rsi = self._rsi(candles["close"], self.indicator_windows["rsi"])
+        # 종가 컬럼은 한 번만 꺼내 가격 조건 판단과 지표 계산이 함께 쓴다.
+        close_arr = candles["close"].to_numpy(dtype=np.float64)
+        close = float(close_arr[-1])
+        if self.price_exit(close, position):
+            return True
+
+        bundle = self._compute_indicators(candles, close_arr)
+        hist, rsi, atr = bundle.hist, bundle.rsi, bundle.atr
 
+        # 조건을 분기 없이 한 번에 OR로 합친다. (pnl / atr < -1)은 atr > 0일 때 pnl < -atr와 같아 나눗셈이 필요 없다.
         if position.side == "buy":
-            trailing_stop = max(position.stop, close - position.trailing)
-            if close <= trailing_stop or close <= position.stop:
-                return True
-            if close >= position.take_profit:
-                return True
-            if hist.iloc[-1] < 0 and rsi.iloc[-1] < 45:
-                return True
-            if atr > 0 and (close - position.entry_price) / atr < -1:
-                return True
-            return False
-
-        trailing_stop = min(position.stop, close + position.trailing)
-        if close >= trailing_stop or close >= position.stop:
-            return True
-        if close <= position.take_profit:
-            return True
-        if hist.iloc[-1] > 0 and rsi.iloc[-1] > 55:
-            return True
-        if atr > 0 and (position.entry_price - close) / atr < -1:
-            return True
-        return False
+            fading = (hist < 0) & (rsi < 45)
+            pnl = close - position.entry_price
+        else:
+            fading = (hist > 0) & (rsi > 55)
+            pnl = position.entry_price - close
+        return fading | ((atr > 0) & (pnl < -atr))
+
+
+def _column(frame: pd.DataFrame, name: str) -> np.ndarray:
+    """Numba 커널에 넘길 연속 float64 배열."""
+
+    return np.ascontiguousarray(frame[name].to_numpy(dtype=np.float64))
+
+
+def _stack_frames(
+    frames: list[pd.DataFrame | CandleBuffer], out: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """캔들 프레임들을 (마켓, 캔들, 필드) float32 배열로 쌓는다.
+
+    길이가 다른 프레임은 캔들 축 뒤쪽에 오른쪽 정렬하고 앞부분은 NaN으로 둔다.
+    out을 주면 (마켓 수, 최대 길이, 필드 수) 모양의 그 배열에 덮어쓴다.
+    스코어는 float32 입력으로 충분하지만 진입가는 정밀도가 필요하므로 마지막 종가는 float64로 따로 반환한다.
+    """
+
+    lengths = np.fromiter((len(f) for f in frames), dtype=np.int64, count=len(frames))
+    n_candles = int(lengths.max()) if len(frames) else 0
+    if out is None:
+        out = np.empty((len(frames), n_candles, len(FIELDS)), dtype=np.float32)
+    closes = np.full(len(frames), np.nan)
+    for i, frame in enumerate(frames):
+        n = lengths[i]
+        pad = n_candles - n
+        if pad:
+            out[i, :pad] = np.nan
+        if not n:
+            continue
+        if isinstance(frame, pd.DataFrame):
+            out[i, pad:] = frame[list(FIELDS)].to_numpy(dtype=np.float32)
+            closes[i] = frame["close"].iat[-1]
+        else:
+            for j, name in enumerate(FIELDS):
+                out[i, pad:, j] = frame.view(name)
+            closes[i] = frame.last_close
+    return out, lengths, closes
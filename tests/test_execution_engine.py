@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from upbit_bot.execution.engine import ExecutionEngine
+
+
+@pytest.fixture
+def engine() -> ExecutionEngine:
+    return ExecutionEngine(client=object())
+
+
+# 구간 상한값은 다음 구간의 호가 단위를 쓴다.
+@pytest.mark.parametrize(
+    ("price", "tick"),
+    [
+        (9.99, 0.01),
+        (10, 0.1),
+        (99.9, 0.1),
+        (100, 1),
+        (999, 1),
+        (1_000, 5),
+        (9_995, 5),
+        (10_000, 10),
+        (49_990, 10),
+        (50_000, 50),
+        (99_950, 50),
+        (100_000, 100),
+        (499_900, 100),
+        (500_000, 500),
+        (999_500, 500),
+        (1_000_000, 1000),
+        (1_999_000, 1000),
+        (2_000_000, 2000),
+        (3_000_000, 2000),
+    ],
+)
+def test_tick_size_band_edges(engine, price, tick):
+    assert engine._tick_size(price) == tick
+
+
+def test_align_prices_matches_align_price(engine):
+    edges = [10, 100, 1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 2_000_000]
+    prices = np.array([p + d for p in edges for d in (-0.004, -1e-9, 0.0, 1e-9, 0.4 * p / 1000)] + [0.123, 4_321_987.0])
+
+    aligned = engine.align_prices(prices)
+
+    np.testing.assert_allclose(aligned, [engine.align_price(float(p)) for p in prices], rtol=0, atol=1e-9)
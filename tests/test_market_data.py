@@ -0,0 +1,94 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from upbit_bot.config import get_settings
+from upbit_bot.data.market_data import CandleBuffer, CandleCache
+
+BAR_MS = 5 * 60_000
+OPEN_MS = 1_700_000_100_000 - 1_700_000_100_000 % BAR_MS
+
+
+def _frame(rows: list[tuple[int, float]]) -> pd.DataFrame:
+    ts, close = zip(*rows)
+    close = np.array(close, dtype=np.float64)
+    return pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(np.array(ts, dtype=np.int64), unit="ms"),
+            "open": close,
+            "high": close,
+            "low": close,
+            "close": close,
+            "volume": np.ones(len(close)),
+        }
+    )
+
+
+def test_push_overwrites_forming_bar_by_open_time():
+    buffer = CandleBuffer(capacity=4, bar_ms=BAR_MS)
+
+    # 진행 중인 봉의 timestamp(마지막 체결 시각)는 조회마다 커진다.
+    buffer.push(OPEN_MS + 10_000, 1.0, 1.0, 1.0, 1.0, 1.0)
+    buffer.push(OPEN_MS + 70_000, 2.0, 2.0, 2.0, 2.0, 2.0)
+
+    assert len(buffer) == 1
+    assert buffer.last_ts == OPEN_MS
+    assert buffer.view("close").tolist() == [2.0]
+
+    buffer.push(OPEN_MS + BAR_MS + 5_000, 3.0, 3.0, 3.0, 3.0, 3.0)
+
+    assert len(buffer) == 2
+    assert buffer.view("close").tolist() == [2.0, 3.0]
+
+
+def test_extend_frame_matches_refetched_window():
+    buffer = CandleBuffer(capacity=4, bar_ms=BAR_MS)
+    first = _frame([(OPEN_MS + 200_000, 1.0), (OPEN_MS + BAR_MS + 30_000, 2.0)])
+    second = _frame([(OPEN_MS + 200_000, 1.0), (OPEN_MS + BAR_MS + 90_000, 2.5)])
+
+    buffer.extend_frame(first)
+    buffer.extend_frame(second)
+
+    assert len(buffer) == 2
+    assert buffer.view("close").tolist() == [1.0, 2.5]
+    assert buffer.last_close == 2.5
+
+
+class _FakeCandleClient:
+    def __init__(self):
+        self.price = 1.0
+        self.count = 5
+
+    async def minute_candles(self, market, unit, count):
+        return [
+            {
+                "market": market,
+                "timestamp": OPEN_MS + i * BAR_MS,
+                "opening_price": self.price,
+                "high_price": self.price,
+                "low_price": self.price,
+                "trade_price": self.price,
+                "candle_acc_trade_price": 1.0,
+                "candle_acc_trade_volume": 1.0,
+            }
+            for i in range(self.count)
+        ]
+
+
+def test_refresh_keeps_previously_loaded_frames(tmp_path, monkeypatch):
+    for key in ("UPBIT_ACCESS_KEY", "UPBIT_SECRET_KEY", "DATABASE_URL"):
+        monkeypatch.setenv(key, "test")
+    get_settings.cache_clear()
+    client = _FakeCandleClient()
+    cache = CandleCache(tmp_path, client=client)
+
+    asyncio.run(cache.refresh("KRW-A"))
+    old = cache.load("KRW-A")
+    client.price, client.count = 2.0, 2
+    asyncio.run(cache.refresh("KRW-A"))
+
+    assert old["close"].tolist() == [1.0] * 5
+    assert cache.load("KRW-A")["close"].tolist() == [2.0, 2.0]
+    assert [p.name for p in tmp_path.iterdir()] == ["KRW-A_m1.arrow"]
+    get_settings.cache_clear()
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from upbit_bot.strategy.engine import PositionSnapshot, StrategyEngine
+
+WINDOWS = {"ema_fast": 21, "ema_slow": 55, "rsi": 14}
+
+
+# 커널 도입 전 pandas 구현. Numba 커널은 이 값과 같아야 한다.
+def _ref_rsi(close: pd.Series, window: int) -> pd.Series:
+    delta = close.diff()
+    gain = delta.clip(lower=0).rolling(window).mean()
+    loss = -delta.clip(upper=0).rolling(window).mean()
+    rs = gain / loss.replace(0, float("inf"))
+    return 100 - (100 / (1 + rs))
+
+
+def _ref_atr(frame: pd.DataFrame, window: int = 14) -> pd.Series:
+    high_low = frame["high"] - frame["low"]
+    high_close = (frame["high"] - frame["close"].shift()).abs()
+    low_close = (frame["low"] - frame["close"].shift()).abs()
+    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    return tr.rolling(window).mean()
+
+
+def _ref_hist(close: pd.Series) -> pd.Series:
+    macd = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+    return macd - macd.ewm(span=9).mean()
+
+
+def _ref_score(candles: pd.DataFrame) -> float:
+    if len(candles) < 60:
+        return 0.0
+
+    close = candles["close"]
+    volume = candles["volume"].ffill().fillna(0)
+
+    ema_fast = close.ewm(span=WINDOWS["ema_fast"]).mean()
+    ema_slow = close.ewm(span=WINDOWS["ema_slow"]).mean()
+    hist = _ref_hist(close)
+    rsi = _ref_rsi(close, WINDOWS["rsi"])
+    atr = _ref_atr(candles)
+
+    trend_score = (ema_fast.iloc[-1] - ema_slow.iloc[-1]) / close.iloc[-1]
+    momentum_score = (close.iloc[-1] / close.iloc[-10]) - 1
+    volume_score = (volume.iloc[-1] / (volume.rolling(30).mean().iloc[-1] or 1)) - 1
+    quality = 1 if atr.iloc[-1] > 0 else 0
+    rsi_bias = (rsi.iloc[-1] - 50) / 50
+
+    return float(
+        (trend_score * 0.35 + momentum_score * 0.25 + hist.iloc[-1] * 0.2 + rsi_bias * 0.1 + volume_score * 0.1)
+        * quality
+    )
+
+
+def _ref_should_exit(candles: pd.DataFrame, position: PositionSnapshot) -> bool:
+    close = candles["close"].iloc[-1]
+    atr = _ref_atr(candles).iloc[-1]
+    hist = _ref_hist(candles["close"]).iloc[-1]
+    rsi = _ref_rsi(candles["close"], WINDOWS["rsi"]).iloc[-1]
+
+    if position.side == "buy":
+        trailing_stop = max(position.stop, close - position.trailing)
+        if close <= trailing_stop or close <= position.stop or close >= position.take_profit:
+            return True
+        if hist < 0 and rsi < 45:
+            return True
+        return bool(atr > 0 and (close - position.entry_price) / atr < -1)
+
+    trailing_stop = min(position.stop, close + position.trailing)
+    if close >= trailing_stop or close >= position.stop or close <= position.take_profit:
+        return True
+    if hist > 0 and rsi > 55:
+        return True
+    return bool(atr > 0 and (position.entry_price - close) / atr < -1)
+
+
+def _random_frame(rng: np.random.Generator) -> pd.DataFrame:
+    n = int(rng.integers(40, 201))
+    kind = rng.integers(0, 10)
+    if kind == 0:
+        # 종가가 변하지 않는 구간: RSI loss=0, ATR=0 처리를 확인한다.
+        close = np.full(n, float(rng.uniform(10, 1000)))
+        high = low = close.copy()
+    else:
+        close = float(rng.uniform(10, 1000)) * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+        spread = close * rng.uniform(0, 0.01, n)
+        high = close + spread
+        low = close - spread
+    volume = rng.uniform(0, 1000, n)
+    if kind in (1, 2):
+        volume[rng.random(n) < 0.2] = np.nan
+    if kind == 3:
+        volume[:] = np.nan
+    return pd.DataFrame({"open": close, "high": high, "low": low, "close": close, "volume": volume})
+
+
+@pytest.fixture(scope="module")
+def frames() -> list[pd.DataFrame]:
+    rng = np.random.default_rng(20240601)
+    return [_random_frame(rng) for _ in range(300)]
+
+
+def test_score_market_matches_pandas(frames):
+    engine = StrategyEngine()
+    for frame in frames:
+        np.testing.assert_allclose(engine.score_market(frame), _ref_score(frame), rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("side", ["buy", "sell"])
+def test_should_exit_matches_pandas(frames, side):
+    engine = StrategyEngine()
+    rng = np.random.default_rng(7)
+    for frame in frames:
+        close = float(frame["close"].iat[-1])
+        sign = 1 if side == "buy" else -1
+        # 가격 조건에 걸리지 않는 넓은 손절·익절로 지표 기반 청산까지 비교한다.
+        position = PositionSnapshot(
+            market="KRW-T",
+            side=side,
+            entry_price=close * float(rng.uniform(0.9, 1.1)),
+            volume=1.0,
+            stop=close * (1 - sign * 0.5),
+            take_profit=close * (1 + sign * 0.5),
+            trailing=close,
+        )
+        assert bool(engine.should_exit(frame, position)) == _ref_should_exit(frame, position)
+
+
+def test_generate_entry_signals_matches_pandas_within_float32(frames):
+    engine = StrategyEngine()
+    batch = {f"KRW-{i}": frame for i, frame in enumerate(frames)}
+    signals = engine.generate_entry_signals(batch)
+
+    expected = {market: _ref_score(frame) for market, frame in batch.items()}
+    assert set(signals) == {market for market, score in expected.items() if score != 0}
+    for market, signal in signals.items():
+        # 배치 경로는 float32 캔들을 쓰므로 점수는 허용 오차 안에서 비교하고, 진입가는 float64 종가 그대로다.
+        np.testing.assert_allclose(signal.score, expected[market], rtol=1e-3, atol=1e-4)
+        assert signal.entry == batch[market]["close"].iat[-1]
+        assert signal.side == ("buy" if signal.score > 0 else "sell")
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from upbit_bot.adapters.upbit import AsyncTokenBucket
+
+
+def _acquire_times(bucket: AsyncTokenBucket, count: int) -> list[float]:
+    async def run() -> list[float]:
+        start = time.monotonic()
+        elapsed = []
+        for _ in range(count):
+            async with bucket:
+                elapsed.append(time.monotonic() - start)
+        return elapsed
+
+    return asyncio.run(run())
+
+
+def test_burst_up_to_capacity_passes_without_waiting():
+    bucket = AsyncTokenBucket(rate=20.0, capacity=3)
+
+    elapsed = _acquire_times(bucket, 4)
+
+    assert max(elapsed[:3]) < 0.02
+    # 빈 버킷은 토큰 하나가 보충되는 1/rate만큼 기다린다.
+    assert 0.04 <= elapsed[3] < 0.2
+
+
+def test_idle_refill_is_capped_at_capacity():
+    bucket = AsyncTokenBucket(rate=50.0, capacity=2)
+    _acquire_times(bucket, 2)
+    time.sleep(0.2)  # 10개 분량이 지나도 capacity만큼만 쌓인다.
+
+    elapsed = _acquire_times(bucket, 3)
+
+    assert max(elapsed[:2]) < 0.01
+    assert elapsed[2] >= 0.015
+
+
+def test_concurrent_waiters_are_spaced_by_rate():
+    bucket = AsyncTokenBucket(rate=50.0, capacity=1)
+
+    async def run() -> list[float]:
+        start = time.monotonic()
+
+        async def one() -> float:
+            await bucket.acquire()
+            return time.monotonic() - start
+
+        return await asyncio.gather(*(one() for _ in range(5)))
+
+    elapsed = sorted(asyncio.run(run()))
+
+    assert elapsed[0] < 0.01
+    assert elapsed[-1] >= 4 / 50.0 - 0.005